@@ -2,30 +2,95 @@
 # CORD-19 Dataset Analysis - Part 1-3: Data Loading, Cleaning, and Analysis
 # ============================================================================
 
-import pandas as pd
+import os
+
+# Set USE_MODIN=1 to run loading and cleaning on all cores with Modin
+USE_MODIN = os.environ.get('USE_MODIN', '').strip().lower() in ('1', 'true', 'yes')
+if USE_MODIN:
+    import modin.config as modin_config
+    if 'MODIN_ENGINE' not in os.environ:
+        modin_config.Engine.put('ray')
+    modin_config.NPartitions.put(os.cpu_count())
+    import modin.pandas as pd
+else:
+    import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 import matplotlib.pyplot as plt
 import seaborn as sns
+import heapq
+import re
 from collections import Counter
+from operator import itemgetter
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    from numba import njit, types
+    from numba.typed import Dict
+except ImportError:  # numba is optional; title words fall back to pandas
+    njit = None
+
 # Configure plotting style
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (12, 6)
 
+# Title tokenization: ASCII alphanumeric runs of 4+ chars, minus common stop
+# words; runs touching a non-ASCII letter (e.g. 'données') are skipped whole
+# rather than cut into fragments like 'donn'
+WORD_RE = re.compile(r'(?<![^\W_])[a-z0-9]{4,}(?![^\W_])')
+# Non-ASCII characters that are not letters or digits (dashes, curly quotes,
+# non-breaking spaces, combining marks), i.e. word separators for WORD_RE
+NON_ASCII_SEPARATOR_RE = re.compile(r'[^\w\x00-\x7f]')
+STOP_WORDS = frozenset({'a', 'the', 'and', 'or', 'of', 'in', 'to', 'for', 'with', 
+                        'is', 'on', 'at', 'by', 'from', 'as', 'an', 'be', 'this', 
+                        'that', 'are', 'have', 'has', 'was', 'were', 'been'})
+
+# Columns of metadata.csv used downstream; everything else is never loaded
+NEEDED_COLUMNS = ['cord_uid', 'publish_time', 'abstract', 'journal', 'source',
+                  'title', 'authors']
+
+# Set CHUNKSIZE (e.g. 200000) to stream metadata.csv instead of loading it whole
+CHUNKSIZE = int(os.environ.get('CHUNKSIZE', '').strip() or 0)
+
+# Parquet layouts of the cleaned files read by the Streamlit app
+TEXT_COLUMNS = ['authors', 'abstract']
+MAIN_SCHEMA = pa.schema([
+    ('cord_uid', pa.string()), ('publish_time', pa.string()),
+    ('journal', pa.string()), ('source', pa.string()), ('title', pa.string()),
+    ('year', pa.int16()), ('abstract_word_count', pa.int32()),
+    ('has_authors', pa.bool_()),
+])
+TEXT_SCHEMA = pa.schema([
+    ('cord_uid', pa.string()), ('authors', pa.string()), ('abstract', pa.string()),
+])
+
 # ============================================================================
 # PART 1: DATA LOADING AND BASIC EXPLORATION
 # ============================================================================
 
+def count_missing(df):
+    """Missing values per column"""
+    # Arrow-backed columns carry their null count, so no boolean frame is built
+    return pd.Series({
+        col: df[col].array._pa_array.null_count
+        if hasattr(df[col].array, '_pa_array') else int(df[col].isna().sum())
+        for col in df.columns
+    })
+
 def load_and_explore_data(filepath):
     """Load dataset and perform initial exploration"""
     print("=" * 70)
     print("PART 1: DATA LOADING AND BASIC EXPLORATION")
     print("=" * 70)
     
-    # Load the data
-    df = pd.read_csv(filepath)
+    # Load only the needed columns with the multithreaded PyArrow parser
+    # (Modin partitions the parse itself); publish_time stays a string and
+    # is parsed during cleaning
+    read_kwargs = {} if USE_MODIN else {'engine': 'pyarrow'}
+    df = pd.read_csv(filepath, usecols=NEEDED_COLUMNS,
+                     dtype={'cord_uid': str, 'publish_time': str}, **read_kwargs)
     print(f"\n✓ Data loaded successfully!")
     
     # DataFrame dimensions
@@ -41,7 +106,7 @@ def load_and_explore_data(filepath):
     
     # Missing values
     print("\nMissing Values:")
-    missing = df.isnull().sum()
+    missing = count_missing(df)
     missing_pct = (missing / len(df) * 100).round(2)
     missing_info = pd.DataFrame({
         'Missing Count': missing,
@@ -49,95 +114,264 @@ def load_and_explore_data(filepath):
     })
     print(missing_info[missing_info['Missing Count'] > 0])
     
-    # Basic statistics
-    print("\nBasic Statistics (Numerical Columns):")
-    print(df.describe())
-    
     return df
 
 # ============================================================================
 # PART 2: DATA CLEANING AND PREPARATION
 # ============================================================================
 
-def clean_and_prepare_data(df):
-    """Clean data and prepare for analysis"""
-    print("\n" + "=" * 70)
-    print("PART 2: DATA CLEANING AND PREPARATION")
-    print("=" * 70)
-    
+def clean_chunk(df):
+    """Add year and abstract word count, drop rows without a year, fill journals"""
     df_clean = df.copy()
     
-    # Convert publish_time to datetime
-    print("\nConverting publish_time to datetime...")
-    df_clean['publish_time'] = pd.to_datetime(
-        df_clean['publish_time'], 
+    # Extract year from publication date; publish_time is always ISO-like
+    # (YYYY, YYYY-MM or YYYY-MM-DD), so the year is its first four characters
+    df_clean['year'] = pd.to_numeric(
+        df_clean['publish_time'].str.slice(0, 4), 
         errors='coerce'
     )
     
-    # Extract year from publication date
-    print("Extracting publication year...")
-    df_clean['year'] = df_clean['publish_time'].dt.year
-    
     # Remove rows with no year information
     df_clean = df_clean.dropna(subset=['year'])
-    df_clean['year'] = df_clean['year'].astype(int)
-    print(f"✓ Rows after removing entries without year: {len(df_clean)}")
+    df_clean['year'] = df_clean['year'].astype('int16')
     
     # Create abstract word count
-    print("Creating abstract word count...")
-    df_clean['abstract_word_count'] = df_clean['abstract'].fillna('').apply(
-        lambda x: len(str(x).split())
+    df_clean['abstract_word_count'] = (
+        df_clean['abstract'].fillna('').astype(str).str.split().str.len().astype('int32')
     )
     
     # Fill missing journal names
-    print("Filling missing journal names...")
     df_clean['journal'] = df_clean['journal'].fillna('Unknown')
     
+    return df_clean
+
+def clean_and_prepare_data(df):
+    """Clean data and prepare for analysis"""
+    print("\n" + "=" * 70)
+    print("PART 2: DATA CLEANING AND PREPARATION")
+    print("=" * 70)
+    
+    print("\nExtracting publication year...")
+    print("Creating abstract word count...")
+    print("Filling missing journal names...")
+    df_clean = clean_chunk(df)
+    print(f"✓ Rows after removing entries without year: {len(df_clean)}")
+    
+    # Store low-cardinality text columns as categoricals
+    print("Converting journal and source to categories...")
+    for col in ('journal', 'source'):
+        df_clean[col] = df_clean[col].astype('category')
+    
+    # Basic statistics
+    print("\nBasic Statistics (Numerical Columns):")
+    print(df_clean[['year', 'abstract_word_count']].describe())
+    
     print(f"\n✓ Data cleaning complete! Final shape: {df_clean.shape}")
     
     return df_clean
 
+def split_for_app(df_clean):
+    """Split cleaned rows into the app's narrow main frame and its text frame"""
+    df_main = df_clean.drop(columns=TEXT_COLUMNS)
+    df_main['has_authors'] = df_clean['authors'].notna()
+    return df_main, df_clean[['cord_uid'] + TEXT_COLUMNS]
+
+def stream_clean_data(filepath, chunksize):
+    """Load, clean and save metadata.csv one chunk at a time
+    
+    Peak memory is bounded by one chunk. The app's Parquet files are written
+    as chunks arrive, and the counts perform_streamed_analysis needs are
+    accumulated on the way so the data is never scanned twice. The files are
+    written under temporary names and only replace earlier output once the
+    whole CSV has been processed.
+    """
+    print("=" * 70)
+    print(f"PART 1-2: STREAMING LOAD AND CLEANING ({chunksize:,} rows per chunk)")
+    print("=" * 70)
+    
+    counters = {'years': Counter(), 'journals': Counter(),
+                'sources': Counter(), 'title_words': Counter()}
+    missing = None
+    rows_read = rows_kept = 0
+    
+    main_tmp, text_tmp = 'cord19_main.parquet.tmp', 'cord19_text.parquet.tmp'
+    reader = pd.read_csv(filepath, usecols=NEEDED_COLUMNS, chunksize=chunksize,
+                         dtype={'cord_uid': str, 'publish_time': str})
+    with reader, \
+            pq.ParquetWriter(main_tmp, MAIN_SCHEMA, compression='zstd') as main_writer, \
+            pq.ParquetWriter(text_tmp, TEXT_SCHEMA, compression='zstd') as text_writer:
+        for i, chunk in enumerate(reader, start=1):
+            chunk_missing = count_missing(chunk)
+            missing = chunk_missing if missing is None else missing + chunk_missing
+            
+            df_clean = clean_chunk(chunk)
+            rows_read += len(chunk)
+            rows_kept += len(df_clean)
+            # A chunk where no row has a usable publish_time adds nothing
+            if len(df_clean) > 0:
+                df_main, df_text = split_for_app(df_clean)
+                main_writer.write_table(
+                    pa.Table.from_pandas(df_main, schema=MAIN_SCHEMA, preserve_index=False))
+                text_writer.write_table(
+                    pa.Table.from_pandas(df_text, schema=TEXT_SCHEMA, preserve_index=False))
+                
+                counters['years'].update(year_histogram(df_clean['year'].to_numpy()).to_dict())
+                counters['journals'].update(df_clean['journal'].value_counts().to_dict())
+                counters['sources'].update(df_clean['source'].value_counts().to_dict())
+                counters['title_words'].update(dict(count_title_words(df_clean['title'].dropna())))
+            
+            print(f"Chunk {i}: {len(chunk)} rows read, {len(df_clean)} kept")
+    
+    os.replace(main_tmp, 'cord19_main.parquet')
+    os.replace(text_tmp, 'cord19_text.parquet')
+    
+    print(f"\nDataset Dimensions: {rows_read} rows × {len(NEEDED_COLUMNS)} columns")
+    print("\nMissing Values:")
+    if missing is not None:
+        print(missing[missing > 0])
+    print(f"\n✓ Rows after removing entries without year: {rows_kept}")
+    print("✓ Cleaned data saved as 'cord19_main.parquet' and 'cord19_text.parquet'")
+    
+    return counters
+
 # ============================================================================
 # PART 3: DATA ANALYSIS AND VISUALIZATION
 # ============================================================================
 
+# 64-bit FNV-1a, used to count title words by hash instead of by string
+FNV_OFFSET = 0xcbf29ce484222325
+FNV_PRIME = 0x100000001b3
+
+def fnv64(word):
+    """64-bit FNV-1a hash of a bytes word, as a signed int64"""
+    h = FNV_OFFSET
+    for b in word:
+        h = ((h ^ b) * FNV_PRIME) & 0xFFFFFFFFFFFFFFFF
+    return h - (1 << 64) if h >= (1 << 63) else h
+
+# Sorted stop-word hashes, looked up with a binary search in compiled code
+STOP_HASHES = np.array(sorted(fnv64(w.encode()) for w in STOP_WORDS), dtype=np.int64)
+
+if njit is not None:
+    @njit(cache=True)
+    def _count_words(buf, stop_hashes, min_len):
+        """Count ASCII [a-z0-9]+ runs in a lowercase UTF-8 buffer, keyed by hash
+        
+        Bytes >= 0x80 belong to non-ASCII letters and digits, so they are
+        scanned as part of a word and any word containing one is dropped.
+        """
+        counts = Dict.empty(key_type=types.int64, value_type=types.int64)
+        starts = Dict.empty(key_type=types.int64, value_type=types.int64)
+        n = buf.size
+        i = 0
+        while i < n:
+            c = buf[i]
+            if not ((c >= 97 and c <= 122) or (c >= 48 and c <= 57) or c >= 128):
+                i += 1
+                continue
+            start = i
+            ascii_only = True
+            h = np.uint64(FNV_OFFSET)
+            while i < n and ((buf[i] >= 97 and buf[i] <= 122) or
+                             (buf[i] >= 48 and buf[i] <= 57) or buf[i] >= 128):
+                if buf[i] >= 128:
+                    ascii_only = False
+                h = (h ^ np.uint64(buf[i])) * np.uint64(FNV_PRIME)
+                i += 1
+            if not ascii_only or i - start < min_len:
+                continue
+            key = np.int64(h)
+            idx = np.searchsorted(stop_hashes, key)
+            if idx < stop_hashes.size and stop_hashes[idx] == key:
+                continue
+            if key in counts:
+                counts[key] += 1
+            else:
+                counts[key] = 1
+                starts[key] = start
+        return counts, starts
+
+def count_title_words(titles, k=None):
+    """Return the k most frequent title words (all words if k is None) as
+    (word, count) pairs"""
+    # Normalize and lowercase once so both paths see exactly the same text;
+    # NFC keeps accented letters whole instead of letter + combining mark
+    lowered = titles.astype(str).str.normalize('NFC').str.lower()
+    if njit is None:
+        # Tokenize all titles in one vectorized pass
+        tokens = lowered.str.findall(WORD_RE).explode().dropna()
+        word_counts = tokens[~tokens.isin(STOP_WORDS)].value_counts()
+        if k is not None:
+            word_counts = word_counts.head(k)
+        return list(zip(word_counts.index, word_counts.values.tolist()))
+    
+    # Walk one UTF-8 buffer in compiled code. With non-ASCII separators
+    # turned into spaces, every byte >= 0x80 left belongs to a letter or
+    # digit, so the kernel finds the same words as WORD_RE
+    text = NON_ASCII_SEPARATOR_RE.sub(' ', "\n".join(lowered)).encode('utf-8')
+    buf = np.frombuffer(text, dtype=np.uint8)
+    counts, starts = _count_words(buf, STOP_HASHES, 4)
+    
+    # Only the top-k words are ever turned back into strings
+    token_re = re.compile(rb'[a-z0-9]+')
+    if k is None:
+        top = counts.items()
+    else:
+        top = heapq.nlargest(k, counts.items(), key=itemgetter(1))
+    return [(token_re.match(text, starts[h]).group().decode(), n) for h, n in top]
+
+def year_histogram(years):
+    """Papers per year, skipping years without papers"""
+    if years.size == 0:
+        return pd.Series(dtype='int64', name='count').rename_axis('year')
+    # Years span a small integer range, so count them with a direct histogram
+    lo = int(years.min())
+    counts = np.bincount(years - lo)
+    papers_by_year = pd.Series(counts, index=np.arange(lo, lo + counts.size),
+                               name='count').rename_axis('year')
+    return papers_by_year[papers_by_year > 0]
+
 def perform_analysis(df_clean):
     """Perform data analysis and create visualizations"""
+    return report_results(
+        papers_by_year=year_histogram(df_clean['year'].to_numpy()),
+        top_journals=df_clean['journal'].value_counts().head(10),
+        top_sources=df_clean['source'].value_counts().head(10),
+        top_words=count_title_words(df_clean['title'].dropna(), 15)
+    )
+
+def perform_streamed_analysis(counters):
+    """Perform data analysis from the counts gathered by stream_clean_data"""
+    return report_results(
+        papers_by_year=pd.Series(dict(sorted(counters['years'].items())),
+                                 name='count').rename_axis('year'),
+        top_journals=pd.Series(dict(counters['journals'].most_common(10)),
+                               name='count').rename_axis('journal'),
+        top_sources=pd.Series(dict(counters['sources'].most_common(10)),
+                              name='count').rename_axis('source'),
+        top_words=counters['title_words'].most_common(15)
+    )
+
+def report_results(papers_by_year, top_journals, top_sources, top_words):
+    """Print the analyses, create visualizations and save the aggregates"""
     print("\n" + "=" * 70)
     print("PART 3: DATA ANALYSIS AND VISUALIZATION")
     print("=" * 70)
     
     # Analysis 1: Papers by year
     print("\n--- Analysis 1: Publications by Year ---")
-    papers_by_year = df_clean['year'].value_counts().sort_index()
     print(papers_by_year)
     
     # Analysis 2: Top journals
     print("\n--- Analysis 2: Top 10 Publishing Journals ---")
-    top_journals = df_clean['journal'].value_counts().head(10)
     print(top_journals)
     
     # Analysis 3: Top sources
     print("\n--- Analysis 3: Top Publishing Sources ---")
-    top_sources = df_clean['source'].value_counts().head(10)
     print(top_sources)
     
     # Analysis 4: Word frequency in titles
     print("\n--- Analysis 4: Most Frequent Words in Titles ---")
-    all_words = []
-    stop_words = {'a', 'the', 'and', 'or', 'of', 'in', 'to', 'for', 'with', 
-                  'is', 'on', 'at', 'by', 'from', 'as', 'an', 'be', 'this', 
-                  'that', 'are', 'have', 'has', 'was', 'were', 'been'}
-    
-    for title in df_clean['title'].dropna():
-        words = str(title).lower().split()
-        for word in words:
-            # Remove punctuation and filter
-            word = ''.join(c for c in word if c.isalnum())
-            if word and word not in stop_words and len(word) > 3:
-                all_words.append(word)
-    
-    top_words = Counter(all_words).most_common(15)
     print("Top 15 words:", top_words)
     
     # Create visualizations
@@ -181,6 +415,17 @@ def perform_analysis(df_clean):
     print("✓ Visualizations saved as 'cord19_analysis.png'")
     plt.show()
     
+    # Persist the unfiltered aggregates so the app's default view skips them
+    pd.DataFrame({'year': papers_by_year.index, 'count': papers_by_year.values}
+                 ).to_parquet('agg_year.parquet', index=False)
+    pd.DataFrame({'journal': top_journals.index.astype(str), 'count': top_journals.values}
+                 ).to_parquet('agg_journals.parquet', index=False)
+    pd.DataFrame({'source': top_sources.index.astype(str), 'count': top_sources.values}
+                 ).to_parquet('agg_sources.parquet', index=False)
+    pd.DataFrame(top_words, columns=['word', 'count']
+                 ).to_parquet('agg_words.parquet', index=False)
+    print("✓ Aggregates saved as 'agg_*.parquet'")
+    
     return {
         'papers_by_year': papers_by_year,
         'top_journals': top_journals,
@@ -193,18 +438,29 @@ def perform_analysis(df_clean):
 # ============================================================================
 
 if __name__ == "__main__":
-    # Load and explore
-    df = load_and_explore_data('metadata.csv')
-    
-    # Clean and prepare
-    df_clean = clean_and_prepare_data(df)
-    
-    # Analyze and visualize
-    results = perform_analysis(df_clean)
-    
-    # Save cleaned data for Streamlit app
-    df_clean.to_csv('cord19_cleaned.csv', index=False)
-    print("\n✓ Cleaned data saved as 'cord19_cleaned.csv'")
+    if CHUNKSIZE:
+        # Load, clean and save chunk by chunk, then analyze the running counts
+        counters = stream_clean_data('metadata.csv', CHUNKSIZE)
+        results = perform_streamed_analysis(counters)
+    else:
+        # Load and explore
+        df = load_and_explore_data('metadata.csv')
+        
+        # Clean and prepare
+        df_clean = clean_and_prepare_data(df)
+        
+        # Analyze and visualize
+        results = perform_analysis(df_clean)
+        
+        # Save cleaned data for Streamlit app: a narrow main file for filtering
+        # and charts, and a text file with the wide free-text columns. Rows are
+        # in the same order in both, so the app can line them up by position.
+        df_main, df_text = split_for_app(df_clean)
+        df_main.to_parquet('cord19_main.parquet', engine='pyarrow',
+                           compression='zstd', index=False)
+        df_text.to_parquet('cord19_text.parquet', engine='pyarrow',
+                           compression='zstd', index=False)
+        print("\n✓ Cleaned data saved as 'cord19_main.parquet' and 'cord19_text.parquet'")
     
     print("\n" + "=" * 70)
     print("ANALYSIS COMPLETE!")
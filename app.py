@@ -6,9 +6,11 @@
 
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from collections import Counter
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import altair as alt
+import re
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -20,8 +22,13 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Configure style
-sns.set_style("whitegrid")
+# Title tokenization: ASCII alphanumeric runs of 4+ chars, minus common/COVID
+# stop words; runs touching a non-ASCII letter are skipped whole
+WORD_RE = re.compile(r'(?<![^\W_])[a-z0-9]{4,}(?![^\W_])')
+STOP_WORDS = frozenset({'a', 'the', 'and', 'or', 'of', 'in', 'to', 'for', 'with',
+                        'is', 'on', 'at', 'by', 'from', 'as', 'an', 'be', 'this',
+                        'that', 'are', 'have', 'has', 'was', 'were', 'been', 'covid',
+                        'coronavirus', 'virus', 'sars', 'cov', '19', 'disease'})
 
 # ============================================================================
 # LOAD DATA
@@ -31,13 +38,139 @@ sns.set_style("whitegrid")
 def load_data():
     """Load cleaned data with caching"""
     try:
-        df = pd.read_csv('cord19_cleaned.csv')
-        df['publish_time'] = pd.to_datetime(df['publish_time'], errors='coerce')
+        # Parquet keeps the dtypes from cleaning, so no re-parsing is needed;
+        # the wide authors/abstract columns live in a separate file
+        df = pd.read_parquet('cord19_main.parquet', columns=[
+            'title', 'journal', 'source', 'year', 'has_authors',
+            'abstract_word_count', 'publish_time'
+        ])
+        # Arrow-backed text columns let the search run in Arrow compute
+        df['title'] = df['title'].astype('string[pyarrow]')
+        # Streamed files store journal/source as plain strings; either way,
+        # keep sorted categories so the sidebar and sorting need no string sort
+        for col in ('journal', 'source'):
+            df[col] = df[col].astype('category')
+            df[col] = df[col].cat.reorder_categories(sorted(df[col].cat.categories))
         return df
     except FileNotFoundError:
-        st.error("❌ Please run the analysis script first to generate 'cord19_cleaned.csv'")
+        st.error("❌ Please run the analysis script first to generate 'cord19_main.parquet'")
         return None
 
+@st.cache_resource
+def load_text():
+    """Load authors and abstracts on demand, shared across reruns"""
+    text = pd.read_parquet('cord19_text.parquet', columns=['authors', 'abstract'])
+    return text.astype('string[pyarrow]')
+
+@st.cache_data
+def load_aggregates():
+    """Unfiltered aggregates precomputed by analysis.py, or None if missing"""
+    try:
+        return {
+            'year': pd.read_parquet('agg_year.parquet').set_index('year')['count'],
+            'journals': pd.read_parquet('agg_journals.parquet').set_index('journal')['count'],
+            'sources': pd.read_parquet('agg_sources.parquet').set_index('source')['count'],
+        }
+    except FileNotFoundError:
+        return None
+
+def is_unfiltered(year_lo, year_hi, journals_key):
+    """True when the filters select every paper"""
+    return (year_lo <= df['year'].min() and year_hi >= df['year'].max() and
+            len(journals_key) == len(df['journal'].cat.categories))
+
+@st.cache_data
+def sorted_journals():
+    """Journal names for the sidebar; categories are already unique and sorted"""
+    return df['journal'].cat.categories.tolist()
+
+@st.cache_resource
+def journal_code_map():
+    """Map each journal name to its categorical code, built once"""
+    return {j: i for i, j in enumerate(df['journal'].cat.categories)}
+
+def filter_mask(year_lo, year_hi, journals):
+    """Boolean row mask for a year range and journal selection"""
+    years = df['year'].to_numpy()
+    codes = df['journal'].cat.codes.to_numpy()
+    code_map = journal_code_map()
+    sel_codes = np.fromiter((code_map[j] for j in journals),
+                            dtype=codes.dtype, count=len(journals))
+    return (years >= year_lo) & (years <= year_hi) & np.isin(codes, sel_codes)
+
+def search_mask(titles, abstracts, term):
+    """Case-insensitive substring match on title or abstract"""
+    in_title = pc.match_substring(pa.array(titles), term, ignore_case=True)
+    in_abstract = pc.match_substring(pa.array(abstracts), term, ignore_case=True)
+    matches = pc.fill_null(pc.or_kleene(in_title, in_abstract), False)
+    return matches.to_numpy(zero_copy_only=False)
+
+@st.cache_data
+def counts_by_year(year_lo, year_hi, journals_key):
+    """Papers per year for the given filters, cached per filter combination"""
+    aggregates = load_aggregates()
+    if aggregates is not None and is_unfiltered(year_lo, year_hi, journals_key):
+        return aggregates['year']
+    years = df['year'].to_numpy()[filter_mask(year_lo, year_hi, journals_key)]
+    if years.size == 0:
+        return pd.Series(dtype='int64', name='count')
+    # Years span a small integer range, so count them with a direct histogram
+    lo = int(years.min())
+    counts = np.bincount(years - lo)
+    by_year = pd.Series(counts, index=np.arange(lo, lo + counts.size),
+                        name='count').rename_axis('year')
+    return by_year[by_year > 0]
+
+# Abstract length histogram: fixed-width bins, longer abstracts go in the last
+WORD_BIN_WIDTH = 40
+WORD_BINS = 50
+
+@st.cache_data
+def word_count_histogram(year_lo, year_hi, journals_key):
+    """Binned abstract word counts for the given filters"""
+    word_counts = df['abstract_word_count'].to_numpy()[
+        filter_mask(year_lo, year_hi, journals_key)
+    ]
+    # Word counts are non-negative ints, so binning is an integer bincount
+    bins = np.minimum(word_counts // WORD_BIN_WIDTH, WORD_BINS - 1)
+    counts = np.bincount(bins, minlength=WORD_BINS)
+    starts = np.arange(WORD_BINS) * WORD_BIN_WIDTH
+    return pd.DataFrame({'start': starts, 'end': starts + WORD_BIN_WIDTH,
+                         'count': counts})
+
+@st.cache_data
+def summary_stats(year_lo, year_hi, journals_key):
+    """Scalar metrics and top-K tables for the given filters, computed together"""
+    sub = df[filter_mask(year_lo, year_hi, journals_key)]
+    word_counts = sub['abstract_word_count']
+    aggregates = load_aggregates()
+    if aggregates is not None and is_unfiltered(year_lo, year_hi, journals_key):
+        top_journals = aggregates['journals'].head(10)
+        top_sources = aggregates['sources'].head(8)
+    else:
+        top_journals = sub['journal'].value_counts().head(10)
+        top_sources = sub['source'].value_counts().head(8)
+    return {
+        'n_journals': sub['journal'].nunique(),
+        'n_with_authors': int(sub['has_authors'].sum()),
+        'year_min': sub['year'].min(),
+        'year_max': sub['year'].max(),
+        'abstract_mean': word_counts.mean(),
+        'abstract_min': word_counts.min(),
+        'abstract_max': word_counts.max(),
+        'top_journals': top_journals[top_journals > 0],
+        'top_sources': top_sources[top_sources > 0],
+    }
+
+@st.cache_data
+def top_title_words(year_lo, year_hi, journals_key, k=20):
+    """Most frequent title words for the given filters, cached per filter combination"""
+    sub = df[filter_mask(year_lo, year_hi, journals_key)]
+    # Tokenize all titles in one vectorized pass
+    tokens = (sub['title'].dropna().astype(str).str.normalize('NFC').str.lower()
+              .str.findall(WORD_RE).explode().dropna())
+    return tokens[~tokens.isin(STOP_WORDS)].value_counts().head(k)
+
 # Load the data
 df = load_data()
 
@@ -65,24 +198,25 @@ if df is not None:
     )
     
     # Journal filter
-    all_journals = sorted(df['journal'].unique())
+    all_journals = sorted_journals()
     selected_journals = st.sidebar.multiselect(
         "Filter by Journal(s):",
         all_journals,
         default=all_journals[:5] if len(all_journals) > 5 else all_journals
     )
     
-    # Apply filters
-    df_filtered = df[
-        (df['year'] >= year_range[0]) & 
-        (df['year'] <= year_range[1]) &
-        (df['journal'].isin(selected_journals))
-    ]
+    # Apply filters on the integer year and journal-code arrays
+    mask = filter_mask(year_range[0], year_range[1], selected_journals)
+    df_filtered = df[mask]
+    # Hashable, order-independent key for the cached aggregations
+    journals_key = tuple(sorted(selected_journals))
     
     st.sidebar.markdown("---")
     st.sidebar.metric("Filtered Papers", len(df_filtered))
     st.sidebar.metric("Total Papers", len(df))
     
+    stats = summary_stats(year_range[0], year_range[1], journals_key)
+    
     # ========================================================================
     # PAGE 1: DASHBOARD
     # ========================================================================
@@ -97,12 +231,11 @@ if df is not None:
         with col1:
             st.metric("Total Papers", f"{len(df_filtered):,}")
         with col2:
-            st.metric("Unique Journals", df_filtered['journal'].nunique())
+            st.metric("Unique Journals", stats['n_journals'])
         with col3:
-            st.metric("Years Covered", f"{int(df_filtered['year'].min())}-{int(df_filtered['year'].max())}")
+            st.metric("Years Covered", f"{int(stats['year_min'])}-{int(stats['year_max'])}")
         with col4:
-            avg_words = df_filtered['abstract_word_count'].mean()
-            st.metric("Avg Abstract Length", f"{avg_words:.0f} words")
+            st.metric("Avg Abstract Length", f"{stats['abstract_mean']:.0f} words")
         
         st.markdown("---")
         
@@ -111,56 +244,63 @@ if df is not None:
         
         with col1:
             st.subheader("📈 Publications Over Time")
-            papers_by_year = df_filtered['year'].value_counts().sort_index()
+            papers_by_year = counts_by_year(year_range[0], year_range[1], journals_key)
+            
+            year_df = pd.DataFrame({'year': papers_by_year.index,
+                                    'count': papers_by_year.values})
             
-            fig, ax = plt.subplots(figsize=(10, 5))
-            ax.plot(papers_by_year.index, papers_by_year.values, 
-                   marker='o', linewidth=2.5, markersize=8, color='#2E86AB')
-            ax.fill_between(papers_by_year.index, papers_by_year.values, 
-                            alpha=0.3, color='#2E86AB')
-            ax.set_xlabel('Year', fontsize=11)
-            ax.set_ylabel('Number of Papers', fontsize=11)
-            ax.grid(True, alpha=0.3)
-            plt.tight_layout()
-            st.pyplot(fig)
+            base = alt.Chart(year_df).encode(
+                x=alt.X('year:O', title='Year'),
+                y=alt.Y('count:Q', title='Number of Papers')
+            )
+            chart = (base.mark_area(opacity=0.3, color='#2E86AB') +
+                     base.mark_line(point=True, strokeWidth=2.5, color='#2E86AB'))
+            st.altair_chart(chart, use_container_width=True)
         
         with col2:
             st.subheader("🏆 Top 10 Publishing Journals")
-            top_journals = df_filtered['journal'].value_counts().head(10)
+            top_journals = stats['top_journals']
             
-            fig, ax = plt.subplots(figsize=(10, 5))
-            top_journals.plot(kind='barh', ax=ax, color='#A23B72')
-            ax.set_xlabel('Number of Papers', fontsize=11)
-            ax.invert_yaxis()
-            plt.tight_layout()
-            st.pyplot(fig)
+            journal_df = pd.DataFrame({'journal': top_journals.index.astype(str),
+                                       'count': top_journals.values})
+            
+            chart = alt.Chart(journal_df).mark_bar(color='#A23B72').encode(
+                x=alt.X('count:Q', title='Number of Papers'),
+                y=alt.Y('journal:N', sort='-x', title=None)
+            )
+            st.altair_chart(chart, use_container_width=True)
         
         # Row 2: Sources and abstracts
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("📚 Top Publishing Sources")
-            top_sources = df_filtered['source'].value_counts().head(8)
+            top_sources = stats['top_sources']
+            
+            source_df = pd.DataFrame({'source': top_sources.index.astype(str),
+                                      'count': top_sources.values})
             
-            fig, ax = plt.subplots(figsize=(10, 5))
-            top_sources.plot(kind='bar', ax=ax, color='#F18F01')
-            ax.set_ylabel('Number of Papers', fontsize=11)
-            ax.set_xlabel('')
-            plt.xticks(rotation=45, ha='right')
-            plt.tight_layout()
-            st.pyplot(fig)
+            chart = alt.Chart(source_df).mark_bar(color='#F18F01').encode(
+                x=alt.X('source:N', sort='-y', title=None,
+                        axis=alt.Axis(labelAngle=-45)),
+                y=alt.Y('count:Q', title='Number of Papers')
+            )
+            st.altair_chart(chart, use_container_width=True)
         
         with col2:
             st.subheader("📊 Abstract Word Count Distribution")
             
-            fig, ax = plt.subplots(figsize=(10, 5))
-            ax.hist(df_filtered['abstract_word_count'].dropna(), 
-                   bins=50, color='#C73E1D', alpha=0.7, edgecolor='black')
-            ax.set_xlabel('Word Count', fontsize=11)
-            ax.set_ylabel('Frequency', fontsize=11)
-            ax.grid(True, alpha=0.3, axis='y')
-            plt.tight_layout()
-            st.pyplot(fig)
+            # Bin on the server so only 50 bars are sent to the browser
+            hist_df = word_count_histogram(year_range[0], year_range[1], journals_key)
+            
+            chart = alt.Chart(hist_df).mark_bar(
+                color='#C73E1D', opacity=0.7, stroke='black', strokeWidth=0.5
+            ).encode(
+                x=alt.X('start:Q', title='Word Count'),
+                x2='end:Q',
+                y=alt.Y('count:Q', title='Frequency')
+            )
+            st.altair_chart(chart, use_container_width=True)
     
     # ========================================================================
     # PAGE 2: DETAILED ANALYSIS
@@ -173,31 +313,17 @@ if df is not None:
         # Word frequency in titles
         st.subheader("📝 Most Frequent Words in Paper Titles")
         
-        all_words = []
-        stop_words = {'a', 'the', 'and', 'or', 'of', 'in', 'to', 'for', 'with',
-                     'is', 'on', 'at', 'by', 'from', 'as', 'an', 'be', 'this',
-                     'that', 'are', 'have', 'has', 'was', 'were', 'been', 'covid',
-                     'coronavirus', 'virus', 'sars', 'cov', '19', 'disease'}
-        
-        for title in df_filtered['title'].dropna():
-            words = str(title).lower().split()
-            for word in words:
-                word = ''.join(c for c in word if c.isalnum())
-                if word and word not in stop_words and len(word) > 3:
-                    all_words.append(word)
+        word_counts = top_title_words(year_range[0], year_range[1], journals_key)
+        words_df = pd.DataFrame({'word': word_counts.index.astype(str),
+                                 'count': word_counts.values})
         
-        top_words = Counter(all_words).most_common(20)
-        words, counts = zip(*top_words) if top_words else ([], [])
-        
-        fig, ax = plt.subplots(figsize=(12, 6))
-        ax.barh(range(len(words)), counts, color='#2E86AB')
-        ax.set_yticks(range(len(words)))
-        ax.set_yticklabels(words)
-        ax.set_xlabel('Frequency', fontsize=11)
-        ax.set_title('Top 20 Words in Paper Titles', fontsize=13, fontweight='bold')
-        ax.invert_yaxis()
-        plt.tight_layout()
-        st.pyplot(fig)
+        chart = alt.Chart(words_df, title='Top 20 Words in Paper Titles').mark_bar(
+            color='#2E86AB'
+        ).encode(
+            x=alt.X('count:Q', title='Frequency'),
+            y=alt.Y('word:N', sort='-x', title=None)
+        )
+        st.altair_chart(chart, use_container_width=True)
         
         # Statistics section
         col1, col2 = st.columns(2)
@@ -215,25 +341,26 @@ if df is not None:
                 ],
                 'Value': [
                     f"{len(df_filtered):,}",
-                    f"{df_filtered['journal'].nunique():,}",
-                    f"{df_filtered['authors'].notna().sum():,}",
-                    f"{df_filtered['abstract_word_count'].mean():.0f} words",
-                    f"{df_filtered['abstract_word_count'].min():.0f} words",
-                    f"{df_filtered['abstract_word_count'].max():.0f} words"
+                    f"{stats['n_journals']:,}",
+                    f"{stats['n_with_authors']:,}",
+                    f"{stats['abstract_mean']:.0f} words",
+                    f"{stats['abstract_min']:.0f} words",
+                    f"{stats['abstract_max']:.0f} words"
                 ]
             }
             st.table(pd.DataFrame(stats_data))
         
         with col2:
             st.subheader("🗓️ Year-wise Breakdown")
-            year_stats = df_filtered['year'].value_counts().sort_index()
-            fig, ax = plt.subplots(figsize=(10, 5))
-            ax.bar(year_stats.index, year_stats.values, color='#A23B72', alpha=0.8)
-            ax.set_xlabel('Year', fontsize=11)
-            ax.set_ylabel('Number of Papers', fontsize=11)
-            ax.grid(True, alpha=0.3, axis='y')
-            plt.tight_layout()
-            st.pyplot(fig)
+            year_stats = counts_by_year(year_range[0], year_range[1], journals_key)
+            year_df = pd.DataFrame({'year': year_stats.index,
+                                    'count': year_stats.values})
+            
+            chart = alt.Chart(year_df).mark_bar(color='#A23B72', opacity=0.8).encode(
+                x=alt.X('year:O', title='Year'),
+                y=alt.Y('count:Q', title='Number of Papers')
+            )
+            st.altair_chart(chart, use_container_width=True)
     
     # ========================================================================
     # PAGE 3: DATA SAMPLE
@@ -251,10 +378,14 @@ if df is not None:
         with col2:
             sort_by = st.selectbox("Sort by:", ['publish_time', 'abstract_word_count', 'journal'])
         
+        # Both frames share a positional index, so rows line up by label
+        text = load_text()
+        
         # Display data
-        df_display = df_filtered.sort_values(by=sort_by, ascending=False)[
+        df_display = df_filtered.sort_values(by=sort_by, ascending=False).head(num_rows)
+        df_display = df_display.join(text['authors'])[
             ['title', 'authors', 'journal', 'year', 'abstract_word_count']
-        ].head(num_rows)
+        ]
         
         st.dataframe(df_display, use_container_width=True)
         
@@ -272,10 +403,11 @@ if df is not None:
         
         search_term = st.text_input("Search in titles and abstracts:")
         if search_term:
-            search_results = df_filtered[
-                (df_filtered['title'].str.contains(search_term, case=False, na=False)) |
-                (df_filtered['abstract'].str.contains(search_term, case=False, na=False))
-            ][['title', 'authors', 'journal', 'year']]
+            matches = search_mask(df_filtered['title'], text['abstract'][mask],
+                                  search_term)
+            search_results = df_filtered[matches].join(text['authors'])[
+                ['title', 'authors', 'journal', 'year']
+            ]
             
             st.write(f"Found {len(search_results)} papers matching '{search_term}'")
             st.dataframe(search_results, use_container_width=True)